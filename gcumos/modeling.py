@@ -20,17 +20,12 @@
 Provides modeling utilities
 """
 from inspect import getfullargspec, getdoc, isclass
-from typing import NamedTuple, List, Dict
+from typing import NamedTuple, NoReturn, List, Dict, get_origin
 from enum import Enum
 from collections import namedtuple, OrderedDict
 
-try:
-    from typing import NoReturn  # odd import error occurs in Python 3.5 testing
-except ImportError:
-    NoReturn = None
-
 import numpy as np
-from .utils import reraise
+from .utils import reraise, namedtuple_field_types, _namedtuple_annotations
 
 
 _NUMPY_PRIMITIVES = {np.int64, np.int32, np.float64, np.float32}
@@ -46,7 +41,7 @@ class Empty(tuple):
     '''Empty NamedTuple-ish type that consumes any input and returns an empty tuple'''
     __slots__ = ()
     _fields = ()
-    _field_types = OrderedDict()
+    __annotations__ = OrderedDict()
 
     def __new__(cls, *args, **kwargs):
         return super().__new__(cls)
@@ -156,7 +151,7 @@ def _already_wrapped(field_types):
 
 def _is_namedtuple(t):
     '''Returns True if type `t` is a NamedTuple type'''
-    return isclass(t) and issubclass(t, tuple) and hasattr(t, '_field_types')
+    return isclass(t) and issubclass(t, tuple) and hasattr(t, '_fields') and _namedtuple_annotations(t) is not None
 
 
 def _is_subclass(c, t):
@@ -164,6 +159,16 @@ def _is_subclass(c, t):
     return isclass(c) and issubclass(c, t)
 
 
+def _is_list(t):
+    '''Returns True if type `t` is a List type'''
+    return get_origin(t) is list
+
+
+def _is_dict(t):
+    '''Returns True if type `t` is a Dict type'''
+    return get_origin(t) is dict
+
+
 def _create_input_type(name, field_types):
     '''Generates a NamedTuple for input arguments'''
     return NamedTuple("{}In".format(name), field_types) if field_types else Empty
@@ -206,25 +211,25 @@ def _assert_valid_type(t, container=None):
         if t.__name__ in _RESERVED_NAMES and t not in _RESERVED_TYPES:
             raise Exception("NamedTuple {} cannot use a reserved name: {}".format(t, _RESERVED_NAMES))
 
-        for tt in t._field_types.values():
+        for tt in namedtuple_field_types(t).values():
             _assert_valid_type(tt)
 
-    elif _is_subclass(t, List):
+    elif _is_list(t):
         if container is not None:
-            raise Exception("List types cannot be nested within {} types. Use NamedTuple instead".format(container.__name__))
+            raise Exception("List types cannot be nested within {} types. Use NamedTuple instead".format(container))
 
-        _assert_valid_type(t.__args__[0], container=List)
+        _assert_valid_type(t.__args__[0], container='List')
 
-    elif _is_subclass(t, Dict):
+    elif _is_dict(t):
         if container is not None:
-            raise Exception("Dict types cannot be nested within {} types. Use NamedTuple instead".format(container.__name__))
+            raise Exception("Dict types cannot be nested within {} types. Use NamedTuple instead".format(container))
 
         key_type, value_type = t.__args__
 
         if key_type is not str:
             raise Exception('Dict keys must be str type')
 
-        _assert_valid_type(value_type, container=Dict)
+        _assert_valid_type(value_type, container='Dict')
 
     elif _is_subclass(t, Enum):
         pass
@@ -240,7 +245,7 @@ def create_dataframe(name, df):
     if not isinstance(df, pd.DataFrame):
         raise Exception('Input `df` must be a pandas.DataFrame')
 
-    dtypes = list(df.dtypes.iteritems())
+    dtypes = list(df.dtypes.items())
     for field_name, dtype in dtypes:
         if dtype not in _dtype2prim:
             raise Exception("DataFrame column '{}' has an unsupported type '{}'. Supported types are: {}".format(field_name, dtype, _NUMPY_PRIMITIVES))
@@ -21,52 +21,62 @@ Provides custom pickle utilities
 """
 import sys
 import json
+import pickle
 import inspect
 import contextlib
 import tempfile
-from os import makedirs
-from os.path import basename, isdir, isfile, join as path_join
-from copy import deepcopy
-from functools import partial
-from typing import GenericMeta, Dict, List
-from types import ModuleType
+import sysconfig
+from os import makedirs, listdir
+from os.path import basename, isdir, isfile, normpath, sep as pathsep, join as path_join
+from functools import partial, lru_cache
+from typing import Dict, List
+from types import ModuleType, CodeType, FrameType, TracebackType
 from importlib import import_module
+from importlib.machinery import all_suffixes
 
 import dill
 
 from .modeling import _is_namedtuple, create_namedtuple, Empty
 from .utils import namedtuple_field_types
+from .metadata import PACKAGE_DIRS
+
+
+def _stdlib_module_names():
+    '''Returns the names of standard library modules, which never need to be shipped with a model'''
+    if hasattr(sys, 'stdlib_module_names'):
+        return sys.stdlib_module_names
+
+    # Python < 3.10: approximate with the modules found in the base interpreter's (not a virtualenv's) stdlib dirs
+    paths = sysconfig.get_paths(vars={'base': sys.base_prefix, 'platbase': sys.base_exec_prefix})
+    dirs = (paths['stdlib'], paths['platstdlib'], path_join(paths['platstdlib'], 'lib-dynload'),
+            path_join(sys.base_exec_prefix, 'DLLs'))
+    suffixes = tuple(all_suffixes())
+    names = set()
+    for dir_ in filter(isdir, dirs):
+        for name in listdir(dir_):
+            if name.endswith(suffixes):
+                names.add(name.partition('.')[0])
+            elif isfile(path_join(dir_, name, '__init__.py')):
+                names.add(name)
+    return names
 
 
 _DEFAULT_MODULES = ('gcumos', 'dill')
-_BLACKLIST = {'builtins', }
+_BLACKLIST = frozenset({'builtins', }).union(sys.builtin_module_names, _stdlib_module_names())
 _DEFAULT = 'default'
 
 _contexts = dict()
 
-dump_model = partial(dill.dump, recurse=True)
-dumps_model = partial(dill.dumps, recurse=True)
+# models are always dumped with dill: the C pickler bypasses the `_patch_dill` save hook, which is
+# where custom serialization and dependency bookkeeping happen. loading already uses the C unpickler
+dump_model = partial(dill.dump, recurse=True, protocol=pickle.HIGHEST_PROTOCOL)
+dumps_model = partial(dill.dumps, recurse=True, protocol=pickle.HIGHEST_PROTOCOL)
 load_model = dill.load
 loads_model = dill.loads
 
 
-def _save_annotation(pickler, obj):
-    '''Workaround for dill annotation serialization bug'''
-    if obj.__origin__ in (Dict, List):
-        # recursively save object
-        t = obj.__origin__
-        args = obj.__args__
-        pickler.save_reduce(_load_annotation, (t, args), obj=obj)
-    else:
-        # eventually hit base type, then use stock pickling logic. temp revert prevents infinite recursion
-        t = obj
-        args = None
-        with _revert_dispatch(GenericMeta):
-            pickler.save_reduce(_load_annotation, (t, args), obj=obj)
-
-
 def _load_annotation(t, args):
-    '''Workaround for dill annotation serialization bug'''
+    '''Rebuilds annotations in pickles written by versions that ran on Python < 3.7; nothing saves them anymore'''
     if t is Dict and args is not None:
         return Dict[args[0], args[1]]
     elif t is List and args is not None:
@@ -86,16 +96,6 @@ def _load_namedtuple(name, field_types):
     return create_namedtuple(name, [(k, v) for k, v in field_types.items()])
 
 
-@contextlib.contextmanager
-def _revert_dispatch(t):
-    '''Temporarily removes a type from the dispatch table to use existing serialization logic'''
-    f = dill.Pickler.dispatch.pop(t)
-    try:
-        yield
-    finally:
-        dill.Pickler.dispatch[t] = f
-
-
 def _add_file(subdir, name):
     '''Helper function which returns the absolute and context-relative path of a file to be added'''
     file_abspath = path_join(subdir, name)
@@ -103,9 +103,6 @@ def _add_file(subdir, name):
     return file_abspath, file_relpath
 
 
-dill.Pickler.dispatch[GenericMeta] = _save_annotation
-
-
 _CUSTOM_DISPATCH = {
 }
 
@@ -114,16 +111,17 @@ _CUSTOM_DISPATCH = {
 def _patch_dill():
     '''Temporarily patches the dill Pickler dispatch table to support custom serialization within a context'''
     try:
-        dispatch = dill.Pickler.dispatch
-        dill.Pickler.dispatch = deepcopy(dispatch)
-
         pickler_save = dill.Pickler.save
+        patched_types = []  # (type, previous save function) pairs replaced within this context
 
         def wrapped_save(pickler, obj, save_persistent_id=True):
             '''Hook that intercepts objects about to be saved'''
-            _catch_object(obj)
+            obj_type = obj if isinstance(obj, type) else type(obj)  # inlined `inspect.isclass`, called per object
+            _catch_object(obj, obj_type, patched_types)
 
-            if _is_namedtuple(obj) and obj is not Empty:
+            # only NamedTuple classes need special handling; their instances are pickled normally. classes that were
+            # already saved are left to the stock logic, which emits a memo reference instead of reducing them again
+            if obj is obj_type and _is_namedtuple_type(obj) and obj is not Empty and id(obj) not in pickler.memo:
                 _save_namedtuple(pickler, obj)
             else:
                 pickler_save(pickler, obj, save_persistent_id)
@@ -131,29 +129,45 @@ def _patch_dill():
         dill.Pickler.save = wrapped_save
         yield
     finally:
-        dill.Pickler.dispatch = dispatch
+        for t, f in reversed(patched_types):
+            if f is None:
+                dill.Pickler.dispatch.pop(t, None)
+            else:
+                dill.Pickler.dispatch[t] = f
         dill.Pickler.save = pickler_save
 
 
-def _catch_object(obj):
+def _catch_object(obj, obj_type, patched_types):
     '''Inspects object and executes custom serialization / bookkeeping logic'''
 
-    # dynamically extend dispatch table to prevent unnecessary imports / dependencies
-    obj_type = obj if inspect.isclass(obj) else type(obj)
-    if obj_type not in dill.Pickler.dispatch:
-        for path in _get_mro_paths(obj_type):
-            if path in _CUSTOM_DISPATCH:
-                dill.Pickler.dispatch[obj_type] = _CUSTOM_DISPATCH[path]
+    # dynamically extend dispatch table to prevent unnecessary imports / dependencies. the table is shared with
+    # other contexts (and dill registers types lazily), so the installed entry is re-checked for every object
+    save_func = _resolve_custom_dispatch(obj_type)
+    if save_func is not None:
+        dispatch = dill.Pickler.dispatch
+        previous = dispatch.get(obj_type)
+        if previous is not save_func:
+            dispatch[obj_type] = save_func
+            patched_types.append((obj_type, previous))
 
     base_module = _get_base_module(obj)
-    if base_module is not None and base_module.__name__ not in _BLACKLIST:
+    if base_module is not None and not _is_blacklisted(base_module):
         context = get_context()
         context.add_module(base_module)
 
 
 def _get_base_module(obj):
     '''Returns the base module for a given object'''
-    module = inspect.getmodule(obj)
+    # mirrors `inspect.getmodule`, which only needs the expensive file-based search for source objects
+    if isinstance(obj, ModuleType):
+        module = obj
+    elif hasattr(obj, '__module__'):
+        module = sys.modules.get(obj.__module__)
+    elif isinstance(obj, (CodeType, FrameType, TracebackType)):
+        module = inspect.getmodule(obj)
+    else:
+        module = None
+
     if module is not None:
         base_name, _, _ = module.__name__.partition('.')
         base_module = sys.modules[base_name]
@@ -162,10 +176,40 @@ def _get_base_module(obj):
     return base_module
 
 
+@lru_cache(maxsize=4096)
+def _is_blacklisted(module):
+    '''Returns True if `module` is the interpreter's own module rather than a user module shadowing its name'''
+    if module.__name__ not in _BLACKLIST:
+        return False
+
+    path = getattr(module, '__file__', None)
+    if path is None:
+        return True
+
+    path = normpath(path)
+    return path.startswith(normpath(sys.base_prefix)) and not PACKAGE_DIRS & set(path.split(pathsep))
+
+
+@lru_cache(maxsize=4096)
+def _is_namedtuple_type(type_):
+    '''Returns True if class `type_` is a NamedTuple type'''
+    return _is_namedtuple(type_)
+
+
+@lru_cache(maxsize=4096)
+def _resolve_custom_dispatch(type_):
+    '''Returns the `_CUSTOM_DISPATCH` save function matching the MRO of `type_`, or None'''
+    save_func = None
+    for path in _get_mro_paths(type_):
+        if path in _CUSTOM_DISPATCH:
+            save_func = _CUSTOM_DISPATCH[path]
+    return save_func
+
+
+@lru_cache(maxsize=4096)
 def _get_mro_paths(type_):
-    '''Yields import path string for each entry in `inspect.getmro`'''
-    for t in inspect.getmro(type_):
-        yield "{}.{}".format(t.__module__, t.__name__)
+    '''Returns a tuple of import path strings for each entry in `inspect.getmro`'''
+    return tuple("{}.{}".format(t.__module__, t.__name__) for t in inspect.getmro(type_))
 
 
 class AcumosContext(object):
@@ -175,7 +219,13 @@ class AcumosContext(object):
         if not isdir(root_dir):
             raise Exception("AcumosContext root directory {} does not exist".format(root_dir))
         self._modules = set()
+        self._packages = set()
+        self._scripts = set()
+        self._package_names = set()
+        self._script_names = set()
+        self._frozen = dict()  # frozenset views of the above, cached until the next module is added
         self._root_dir = root_dir
+        self._root_basename = basename(root_dir)
         self._params_path = path_join(root_dir, 'context.json')
         self.parameters = self._load_params()
 
@@ -193,6 +243,8 @@ class AcumosContext(object):
 
     def build_path(self, *paths):
         '''Returns an absolute path starting from the context root'''
+        if not paths:
+            return self._root_dir
         return path_join(self._root_dir, *paths)
 
     def add_module(self, module):
@@ -205,7 +257,24 @@ class AcumosContext(object):
         elif not isinstance(module, ModuleType):
             raise Exception("Module must be of type str or types.ModuleType, not {}".format(type(module)))
 
+        if module in self._modules:
+            return
+
         self._modules.add(module)
+        if module.__package__:
+            self._packages.add(module)
+            self._package_names.add(module.__name__)
+        elif module.__name__ != '__main__':
+            self._scripts.add(module)
+            self._script_names.add(module.__name__)
+        self._frozen.clear()
+
+    def _freeze(self, attr):
+        '''Returns a cached frozenset of the set stored at `attr`'''
+        frozen = self._frozen.get(attr)
+        if frozen is None:
+            frozen = self._frozen[attr] = frozenset(getattr(self, attr))
+        return frozen
 
     @property
     def abspath(self):
@@ -215,39 +284,39 @@ class AcumosContext(object):
     @property
     def basename(self):
         '''Base name of the context root directory'''
-        return basename(self._root_dir)
+        return self._root_basename
 
     @property
     def modules(self):
         '''The set of all modules (i.e. typing.ModuleType) identified as dependencies'''
-        return frozenset(self._modules)
+        return self._freeze('_modules')
 
     @property
     def packages(self):
         '''The set of all base packages (i.e. typing.ModuleType with a package) identified as dependencies'''
-        return frozenset(mod for mod in self._modules if mod.__package__)
+        return self._freeze('_packages')
 
     @property
     def package_names(self):
         '''The set of all base package names identified as dependencies'''
-        return frozenset(mod.__name__ for mod in self.packages)
+        return self._freeze('_package_names')
 
     @property
     def scripts(self):
         '''The set of all scripts (i.e. typing.ModuleType with no package) identified as dependencies'''
-        return frozenset(script for script in (mod for mod in self._modules if not mod.__package__) if script.__name__ != '__main__')
+        return self._freeze('_scripts')
 
     @property
     def script_names(self):
         '''The set of all script names identified as dependencies'''
-        return frozenset(mod.__name__ for mod in self.scripts)
+        return self._freeze('_script_names')
 
     def _load_params(self):
         '''Returns a parameters dict'''
-        if isfile(self._params_path):
+        try:
             with open(self._params_path) as f:
                 return json.load(f)
-        else:
+        except FileNotFoundError:
             return dict()
 
     def save_params(self):
@@ -29,7 +29,7 @@ from os import makedirs
 
 import numpy as np
 
-from .modeling import List, Dict, Enum, _is_namedtuple
+from .modeling import Enum, _is_namedtuple, _is_subclass, _is_list, _is_dict
 from .utils import namedtuple_field_types
 
 
@@ -68,8 +68,7 @@ _type_lookup = {
     np.int64: 'int64',
     np.int32: 'int32',
     np.float32: 'float',
-    np.float64: 'double',
-    np.bool: 'bool'}
+    np.float64: 'double'}
 
 
 def compile_protostr(proto_str, package_name, module_name, out_dir):
@@ -126,12 +125,12 @@ def _proto_iter(nt):
     if _is_namedtuple(nt):
         yield nt
 
-        for t in nt._field_types.values():
+        for t in namedtuple_field_types(nt).values():
             if _is_namedtuple(t):
                 yield from _proto_iter(t)
-            elif issubclass(t, Enum):
+            elif _is_subclass(t, Enum):
                 yield t
-            elif issubclass(t, List) or issubclass(t, Dict):
+            elif _is_container(t):
                 for tt in t.__args__:
                     yield from _proto_iter(tt)
 
@@ -158,7 +157,7 @@ def _types_equal(t1, t2):
         values_match = all(_types_equal(v1, v2) for v1, v2 in zip(ft1.values(), ft2.values()))
         return names_match and keys_match and values_match
 
-    if issubclass(t1, Enum) and issubclass(t2, Enum):
+    if _is_subclass(t1, Enum) and _is_subclass(t2, Enum):
         names_match = t1.__name__ == t2.__name__
         enums_match = [(e.name, e.value) for e in t1] == [(e.name, e.value) for e in t2]
         return names_match and enums_match
@@ -207,19 +206,19 @@ def _field2proto(name, type_, index, type_names, rjust=None):
     if type_ in _type_lookup:
         string = "{} {} = {};".format(_type2proto(type_), name, index)
 
-    elif _is_namedtuple(type_) or issubclass(type_, Enum):
+    elif _is_namedtuple(type_) or _is_subclass(type_, Enum):
         tn = type_.__name__
         if tn not in type_names:
             raise Exception("Could not build protobuf field using unknown custom type {}".format(tn))
         string = "{} {} = {};".format(tn, name, index)
 
-    elif issubclass(type_, List):
+    elif _is_list(type_):
         inner = type_.__args__[0]
         if _is_container(inner):
             raise NestedTypeError("Nested container {} is not yet supported; try using NamedTuple instead".format(type_))
         string = "repeated {}".format(_field2proto(name, inner, index, type_names, 0))
 
-    elif issubclass(type_, Dict):
+    elif _is_dict(type_):
         k, v = type_.__args__
         if any(map(_is_container, (k, v))):
             raise NestedTypeError("Nested container {} is not yet supported; try using NamedTuple instead".format(type_))
@@ -235,14 +234,14 @@ def _field2proto(name, type_, index, type_names, rjust=None):
 
 
 def _is_container(t):
-    return issubclass(t, Dict) or issubclass(t, List)
+    return _is_dict(t) or _is_list(t)
 
 
 def _type2proto(t):
     '''Returns a string corresponding to the protobuf type'''
     if t in _type_lookup:
         return _type_lookup[t]
-    elif _is_namedtuple(t) or issubclass(t, Enum):
+    elif _is_namedtuple(t) or _is_subclass(t, Enum):
         return t.__name__
     else:
         raise Exception("Unknown protobuf mapping for type {}".format(t))
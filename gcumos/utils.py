@@ -28,10 +28,21 @@ from collections import OrderedDict
 
 def namedtuple_field_types(nt):
     '''Returns an OrderedDict corresponding to NamedTuple field types'''
-    field_types = nt._field_types
+    field_types = _namedtuple_annotations(nt)
     return OrderedDict((field, field_types[field]) for field in nt._fields)
 
 
+def _namedtuple_annotations(nt):
+    '''Returns the annotations dict declaring all NamedTuple fields of `nt`, or None if there is none'''
+    # annotations are not inherited on Python 3.10+, so NamedTuple subclasses need to search their bases
+    fields = nt._fields
+    for base in nt.__mro__:
+        annotations = getattr(base, '__annotations__', None)
+        if annotations is not None and all(field in annotations for field in fields):
+            return annotations
+    return None
+
+
 def load_module(fullname, path):
     '''Imports and returns a module from path for Python 3.5+'''
     spec = spec_from_file_location(fullname, path)
@@ -27,9 +27,9 @@ from os.path import isfile, isdir, join as path_join
 
 from google.protobuf.json_format import Parse as ParseJson, ParseDict, MessageToJson, MessageToDict
 
-from .modeling import _is_namedtuple, List, Dict
+from .modeling import _is_namedtuple, _is_list, _is_dict
 from .pickler import AcumosContextManager, load_model as _load_model
-from .utils import load_module
+from .utils import load_module, namedtuple_field_types
 
 
 def load_packaged_model(path):
@@ -190,7 +190,7 @@ class WrappedResponse(object):
 def _pack_pb_msg(wrapped_in, module):
     '''Returns a protobuf message object from a NamedTuple instance'''
     wrapped_type = type(wrapped_in)
-    field_types = wrapped_type._field_types
+    field_types = namedtuple_field_types(wrapped_type)
     pb_type = getattr(module, wrapped_type.__name__)
     return pb_type(**{f: _set_pb_value(field_types[f], v, module) for f, v in zip(wrapped_in._fields, wrapped_in)})
 
@@ -200,12 +200,12 @@ def _set_pb_value(wrapped_type, value, module):
     if _is_namedtuple(wrapped_type):
         return _pack_pb_msg(value, module)
 
-    elif issubclass(wrapped_type, Dict):
+    elif _is_dict(wrapped_type):
         _, val_type = wrapped_type.__args__
         if _is_namedtuple(val_type):
             return {k: _pack_pb_msg(v, module) for k, v in value.items()}
 
-    elif issubclass(wrapped_type, List):
+    elif _is_list(wrapped_type):
         list_type = wrapped_type.__args__[0]
         if _is_namedtuple(list_type):
             return [_pack_pb_msg(v, module) for v in value]
@@ -215,7 +215,7 @@ def _set_pb_value(wrapped_type, value, module):
 
 def _unpack_pb_msg(input_type, pb_msg):
     '''Returns a NamedTuple from protobuf message'''
-    values = {f: _get_pb_value(t, getattr(pb_msg, f)) for f, t in input_type._field_types.items()}
+    values = {f: _get_pb_value(t, getattr(pb_msg, f)) for f, t in namedtuple_field_types(input_type).items()}
     return input_type(**values)
 
 
@@ -224,12 +224,12 @@ def _get_pb_value(wrapped_type, pb_value):
     if _is_namedtuple(wrapped_type):
         return _unpack_pb_msg(wrapped_type, pb_value)
 
-    elif issubclass(wrapped_type, Dict):
+    elif _is_dict(wrapped_type):
         _, val_type = wrapped_type.__args__
         if _is_namedtuple(val_type):
             return {k: _unpack_pb_msg(val_type, v) for k, v in pb_value.items()}
 
-    elif issubclass(wrapped_type, List):
+    elif _is_list(wrapped_type):
         list_type = wrapped_type.__args__[0]
         if _is_namedtuple(list_type):
             return [_unpack_pb_msg(list_type, v) for v in pb_value]
@@ -44,12 +44,13 @@ setup(
         'Intended Audience :: Developers',
         'Intended Audience :: Science/Research',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
-        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'License :: OSI Approved :: Apache Software License',
     ],
     keywords='ChapterIX, artificial intelligence, machine learning, modeling',
-    python_requires='>=3.5, <=3.7',
+    python_requires='>=3.8',
     url='https://github.com/chapterix/chapterix-python-client.git',
 )